@@ -2,18 +2,19 @@
 
 from __future__ import annotations
 
-import itertools
-from typing import TYPE_CHECKING, overload
+import functools
+from typing import TYPE_CHECKING, Any, overload
 
 import ibis.expr.operations
 import ibis.expr.types
 import narwhals as nw
+import numpy as np
 
 import tea_tasting.utils
 
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Sequence
 
     import narwhals.typing  # noqa: TC004
 
@@ -24,8 +25,29 @@ _VAR = "_var__{}"
 _COV = "_cov__{}__{}"
 _DEMEAN = "_demean__{}"
 
+_NUMPY_MAX_ROWS = 50_000
+
+
+@functools.lru_cache(maxsize=1024)
+def _mean_name(col: str) -> str:
+    return _MEAN.format(col)
+
+@functools.lru_cache(maxsize=1024)
+def _var_name(col: str) -> str:
+    return _VAR.format(col)
+
+@functools.lru_cache(maxsize=1024)
+def _cov_name(left: str, right: str) -> str:
+    return _COV.format(left, right)
+
+@functools.lru_cache(maxsize=1024)
+def _demean_name(col: str) -> str:
+    return _DEMEAN.format(col)
+
 
 class Aggregates(tea_tasting.utils.ReprMixin):  # noqa: D101
+    __slots__ = ("count_", "cov_", "mean_", "var_")
+
     count_: int | None
     mean_: dict[str, float | int]
     var_: dict[str, float | int]
@@ -51,6 +73,22 @@ class Aggregates(tea_tasting.utils.ReprMixin):  # noqa: D101
         self.var_ = var_
         self.cov_ = {_sorted_tuple(*k): v for k, v in cov_.items()}
 
+    @classmethod
+    def _unsafe_new(
+        cls,
+        count_: int | None,
+        mean_: dict[str, float | int],
+        var_: dict[str, float | int],
+        cov_: dict[tuple[str, str], float | int],
+    ) -> Aggregates:
+        # Skip normalization of covariance keys. Use only if they are already sorted.
+        obj = cls.__new__(cls)
+        obj.count_ = count_
+        obj.mean_ = mean_
+        obj.var_ = var_
+        obj.cov_ = cov_
+        return obj
+
     def with_zero_div(self) -> Aggregates:
         """Return aggregates that do not raise an error on division by zero.
 
@@ -59,7 +97,7 @@ class Aggregates(tea_tasting.utils.ReprMixin):  # noqa: D101
         - `inf` if numerator is greater than `0`,
         - `nan` if numerator is equal to or less than `0`.
         """
-        return Aggregates(
+        return Aggregates._unsafe_new(
             count_=None if self.count_ is None else tea_tasting.utils.Int(self.count_),
             mean_={k: tea_tasting.utils.numeric(v) for k, v in self.mean_.items()},
             var_={k: tea_tasting.utils.numeric(v) for k, v in self.var_.items()},
@@ -110,6 +148,7 @@ class Aggregates(tea_tasting.utils.ReprMixin):  # noqa: D101
         """Sample covariance.
 
         Assume the variable is a constant if the variable name is `None`.
+        Covariance of a variable with itself is its variance.
 
         Args:
             left: First variable name.
@@ -120,7 +159,9 @@ class Aggregates(tea_tasting.utils.ReprMixin):  # noqa: D101
         """
         if left is None or right is None:
             return 0
-        return self.cov_[_sorted_tuple(left, right)]
+        if left == right and left in self.var_:
+            return self.var_[left]
+        return self.cov_[(left, right) if left < right else (right, left)]
 
     def ratio_var(
         self,
@@ -191,41 +232,118 @@ class Aggregates(tea_tasting.utils.ReprMixin):  # noqa: D101
         Returns:
             Aggregated statistics of the concatenation of two samples.
         """
-        return Aggregates(
-            count_=self.count() + other.count() if self.count_ is not None else None,
-            mean_={col: _add_mean(self, other, col) for col in self.mean_},
-            var_={col: _add_var(self, other, col) for col in self.var_},
-            cov_={cols: _add_cov(self, other, cols) for cols in self.cov_},
+        if self.count_ is None and not (self.mean_ or self.var_ or self.cov_):
+            return Aggregates()
+
+        left_n = self.count()
+        right_n = other.count()
+        total_n = left_n + right_n
+        left_mean = self.mean_
+        right_mean = other.mean_
+        coef = left_n * right_n / total_n
+        diff_of_means = {
+            col: left_mean[col] - right_mean[col]
+            for col in {*self.var_, *(col for pair in self.cov_ for col in pair)}
+        }
+
+        left_var = self.var_
+        right_var = other.var_
+        left_cov = self.cov_
+        right_cov = other.cov_
+        return Aggregates._unsafe_new(
+            count_=total_n,
+            mean_={
+                col: (left_n*mean + right_n*right_mean[col]) / total_n
+                for col, mean in left_mean.items()
+            },
+            var_={
+                col: (
+                    var * (left_n - 1)
+                    + right_var[col] * (right_n - 1)
+                    + diff_of_means[col] * diff_of_means[col] * coef
+                ) / (total_n - 1)
+                for col, var in left_var.items()
+            },
+            cov_={
+                cols: (
+                    cov * (left_n - 1)
+                    + right_cov[cols] * (right_n - 1)
+                    + diff_of_means[cols[0]] * diff_of_means[cols[1]] * coef
+                ) / (total_n - 1)
+                for cols, cov in left_cov.items()
+            },
         )
 
+    @classmethod
+    def reduce(cls, aggrs: Iterable[Aggregates]) -> Aggregates:
+        """Calculate the aggregated statistics of the concatenation of multiple samples.
 
-def _add_mean(left: Aggregates, right: Aggregates, col: str) -> float | int:
-    sum_ = left.count()*left.mean(col) + right.count()*right.mean(col)
-    count = left.count() + right.count()
-    return sum_ / count
+        Samples are assumed to be independent. The result is equal to the sum
+        of the aggregates, but the statistics of all samples are combined
+        at once using NumPy instead of being added pairwise. If any of the
+        aggregates handles division by zero, the result handles it as well.
 
-def _add_var(left: Aggregates, right: Aggregates, col: str) -> float | int:
-    left_n = left.count()
-    right_n = right.count()
-    total_n = left_n + right_n
-    diff_of_means = left.mean(col) - right.mean(col)
-    return (
-        left.var(col) * (left_n - 1)
-        + right.var(col) * (right_n - 1)
-        + diff_of_means * diff_of_means * left_n * right_n / total_n
-    ) / (total_n - 1)
-
-def _add_cov(left: Aggregates, right: Aggregates, cols: tuple[str, str]) -> float | int:
-    left_n = left.count()
-    right_n = right.count()
-    total_n = left_n + right_n
-    diff_of_means0 = left.mean(cols[0]) - right.mean(cols[0])
-    diff_of_means1 = left.mean(cols[1]) - right.mean(cols[1])
-    return (
-        left.cov(*cols) * (left_n - 1)
-        + right.cov(*cols) * (right_n - 1)
-        + diff_of_means0 * diff_of_means1 * left_n * right_n / total_n
-    ) / (total_n - 1)
+        Args:
+            aggrs: Aggregated statistics of the samples.
+
+        Returns:
+            Aggregated statistics of the concatenation of the samples.
+        """
+        aggrs = tuple(aggrs)
+        if len(aggrs) == 0:
+            raise ValueError("At least one Aggregates object is required.")
+        first = aggrs[0]
+        if len(aggrs) == 1:
+            return first
+        if first.count_ is None and not (first.mean_ or first.var_ or first.cov_):
+            return Aggregates()
+
+        var_cols = tuple(first.var_)
+        cov_cols = tuple(first.cov_)
+        cols = tuple({
+            *first.mean_,
+            *var_cols,
+            *(col for pair in cov_cols for col in pair),
+        })
+        idx = {col: i for i, col in enumerate(cols)}
+        counts = np.array([aggr.count() for aggr in aggrs], dtype=np.float64)
+        means = np.array([[aggr.mean_[col] for col in cols] for aggr in aggrs])
+        vars_ = np.array([[aggr.var_[col] for col in var_cols] for aggr in aggrs])
+        covs = np.array([[aggr.cov_[pair] for pair in cov_cols] for aggr in aggrs])
+
+        total_n = sum(aggr.count() for aggr in aggrs)
+        zero_div = any(isinstance(aggr.count_, tea_tasting.utils.Int) for aggr in aggrs)
+        # Raise on division by zero as the sum of the aggregates does.
+        if not zero_div and (
+            total_n == 0
+            or (total_n == 1 and (len(var_cols) > 0 or len(cov_cols) > 0))
+        ):
+            raise ZeroDivisionError("division by zero")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = counts @ means / total_n
+            diff = means - mean
+            var_idx = [idx[col] for col in var_cols]
+            var = (
+                (counts - 1) @ vars_
+                + counts @ (diff[:, var_idx] * diff[:, var_idx])
+            ) / (total_n - 1)
+            left_idx = [idx[left] for left, _ in cov_cols]
+            right_idx = [idx[right] for _, right in cov_cols]
+            cov = (
+                (counts - 1) @ covs
+                + counts @ (diff[:, left_idx] * diff[:, right_idx])
+            ) / (total_n - 1)
+
+        mean_list = mean.tolist()
+        result = Aggregates._unsafe_new(
+            count_=total_n,
+            mean_={col: mean_list[idx[col]] for col in first.mean_},
+            var_=dict(zip(var_cols, var.tolist(), strict=True)),
+            cov_=dict(zip(cov_cols, cov.tolist(), strict=True)),
+        )
+        if zero_div:
+            return result.with_zero_div()
+        return result
 
 
 @overload
@@ -275,10 +393,14 @@ def read_aggregates(
     Returns:
         Aggregated statistics.
     """
-    mean_cols, var_cols, cov_cols = _validate_aggr_cols(mean_cols, var_cols, cov_cols)
+    mean_cols, var_cols, cov_cols = _validate_aggr_cols(
+        tuple(mean_cols),
+        tuple(var_cols),
+        tuple(cov_cols),
+    )
 
     if isinstance(data, ibis.expr.types.Table):
-        aggr_data = _read_aggr_ibis(
+        aggr_data = _read_aggr_memtable(
             data=data,
             group_col=group_col,
             has_count=has_count,
@@ -286,6 +408,15 @@ def read_aggregates(
             var_cols=var_cols,
             cov_cols=cov_cols,
         )
+        if aggr_data is None:
+            aggr_data = _read_aggr_ibis(
+                data=data,
+                group_col=group_col,
+                has_count=has_count,
+                mean_cols=mean_cols,
+                var_cols=var_cols,
+                cov_cols=cov_cols,
+            )
     else:
         aggr_data = _read_aggr_narwhals(
             data=data,
@@ -317,18 +448,22 @@ def read_aggregates(
     }
 
 
+@functools.lru_cache(maxsize=256)
 def _validate_aggr_cols(
-    mean_cols: Sequence[str],
-    var_cols: Sequence[str],
-    cov_cols: Sequence[tuple[str, str]],
+    mean_cols: tuple[str, ...],
+    var_cols: tuple[str, ...],
+    cov_cols: tuple[tuple[str, str], ...],
 ) -> tuple[tuple[str, ...], tuple[str, ...], tuple[tuple[str, str], ...]]:
-    mean_cols = tuple({*mean_cols})
-    var_cols = tuple({*var_cols})
-    cov_cols = tuple({
-        _sorted_tuple(left, right)
-        for left, right in cov_cols
-    })
-    return mean_cols, var_cols, cov_cols
+    # Covariance of a variable with itself is its variance.
+    return (
+        tuple({*mean_cols}),
+        tuple({*var_cols, *(left for left, right in cov_cols if left == right)}),
+        tuple({
+            _sorted_tuple(left, right)
+            for left, right in cov_cols
+            if left != right
+        }),
+    )
 
 
 def _sorted_tuple(left: str, right: str) -> tuple[str, str]:
@@ -337,6 +472,34 @@ def _sorted_tuple(left: str, right: str) -> tuple[str, str]:
     return left, right
 
 
+def _read_aggr_memtable(
+    data: ibis.expr.types.Table,
+    group_col: str | None,
+    *,
+    has_count: bool,
+    mean_cols: Sequence[str],
+    var_cols: Sequence[str],
+    cov_cols: Sequence[tuple[str, str]],
+) -> list[dict[str, int | float]] | None:
+    # Aggregate small in-memory data with NumPy, without SQL compilation.
+    # Other data is left to the backend, so that the results don't depend
+    # on how the table was created.
+    op = data.op()
+    if (
+        not isinstance(op, ibis.expr.operations.InMemoryTable)
+        or len(op.data.obj) > _NUMPY_MAX_ROWS
+    ):
+        return None
+    return _read_aggr_numpy(
+        data=nw.from_native(op.data.to_pyarrow(op.schema), eager_only=True),
+        group_col=group_col,
+        has_count=has_count,
+        mean_cols=mean_cols,
+        var_cols=var_cols,
+        cov_cols=cov_cols,
+    )
+
+
 def _read_aggr_ibis(
     data: ibis.expr.types.Table,
     group_col: str | None,
@@ -346,51 +509,67 @@ def _read_aggr_ibis(
     var_cols: Sequence[str],
     cov_cols: Sequence[tuple[str, str]],
 ) -> list[dict[str, int | float]]:
-    covar_cols = tuple({*var_cols, *itertools.chain(*cov_cols)})
+    return _aggr_ibis(
+        data=data,
+        group_col=group_col,
+        has_count=has_count,
+        mean_cols=mean_cols,
+        var_cols=var_cols,
+        cov_cols=cov_cols,
+    ).to_pyarrow().to_pylist()
+
+
+def _aggr_ibis(
+    data: ibis.expr.types.Table,
+    group_col: str | None,
+    *,
+    has_count: bool,
+    mean_cols: Sequence[str],
+    var_cols: Sequence[str],
+    cov_cols: Sequence[tuple[str, str]],
+) -> ibis.expr.types.Table:
     backend = ibis.get_backend(data)
-    var_op = ibis.expr.operations.Variance
-    cov_op = ibis.expr.operations.Covariance
-    if backend.has_operation(var_op) and backend.has_operation(cov_op):
-        var_expr = {
-            _VAR.format(col): data[col].cast("float").var(how="sample")  # type: ignore
-            for col in var_cols
+    has_var = backend.has_operation(ibis.expr.operations.Variance)
+    has_cov = backend.has_operation(ibis.expr.operations.Covariance)
+    # Use demeaned values only for statistics the backend can't calculate natively.
+    demean_cols = tuple({
+        *(() if has_var else var_cols),
+        *(() if has_cov else (col for pair in cov_cols for col in pair)),
+    })
+    if len(demean_cols) > 0:
+        demean_expr = {
+            _demean_name(col): data[col] - data[col].cast("float").mean()  # type: ignore
+            for col in demean_cols
         }
-        cov_expr = {
-            _COV.format(left, right): data[left].cast("float").cov(  # type: ignore
+        grouped_data = data.group_by(group_col) if group_col is not None else data  # type: ignore
+        data = grouped_data.mutate(**demean_expr)  # type: ignore
+
+    count = data.count()
+    demean = {col: data[_demean_name(col)] for col in demean_cols}
+    var_expr = {
+        _var_name(col): (
+            data[col].cast("float").var(how="sample") if has_var  # type: ignore
+            else (demean[col] * demean[col]).sum() / (count - 1)  # type: ignore
+        )
+        for col in var_cols
+    }
+    cov_expr = {
+        _cov_name(left, right): (
+            data[left].cast("float").cov(  # type: ignore
                 data[right].cast("float"),  # type: ignore
                 how="sample",
-            )
-            for left, right in cov_cols
-        }
-    else:
-        # Use demeaned values if backend doesn't have var and cov functions.
-        if len(covar_cols) > 0:
-            demean_expr = {
-                _DEMEAN.format(col): data[col] - data[col].cast("float").mean()  # type: ignore
-                for col in covar_cols
-            }
-            grouped_data = data.group_by(group_col) if group_col is not None else data  # type: ignore
-            data = grouped_data.mutate(**demean_expr)  # type: ignore
-
-        var_expr = {
-            _VAR.format(col): (
-                data[_DEMEAN.format(col)] * data[_DEMEAN.format(col)]
-            ).sum() / (data.count() - 1)  # type: ignore
-            for col in var_cols
-        }
-        cov_expr = {
-            _COV.format(left, right): (
-                data[_DEMEAN.format(left)] * data[_DEMEAN.format(right)]
-            ).sum() / (data.count() - 1)  # type: ignore
-            for left, right in cov_cols
-        }
+            ) if has_cov
+            else (demean[left] * demean[right]).sum() / (count - 1)  # type: ignore
+        )
+        for left, right in cov_cols
+    }
 
-    count_expr = {_COUNT: data.count()} if has_count else {}
-    mean_expr = {_MEAN.format(col): data[col].cast("float").mean() for col in mean_cols}  # type: ignore
+    count_expr = {_COUNT: count} if has_count else {}
+    mean_expr = {_mean_name(col): data[col].cast("float").mean() for col in mean_cols}  # type: ignore
     all_expr = count_expr | mean_expr | var_expr | cov_expr
 
     grouped_data = data.group_by(group_col) if group_col is not None else data  # type: ignore
-    return grouped_data.aggregate(**all_expr).to_pyarrow().to_pylist()  # type: ignore
+    return grouped_data.aggregate(**all_expr)  # type: ignore
 
 
 def _read_aggr_narwhals(
@@ -404,34 +583,44 @@ def _read_aggr_narwhals(
 ) -> list[dict[str, int | float]]:
     data = nw.from_native(data)
     if not isinstance(data, nw.LazyFrame):  # type: ignore
+        aggr_data = _read_aggr_numpy(
+            data=data,
+            group_col=group_col,
+            has_count=has_count,
+            mean_cols=mean_cols,
+            var_cols=var_cols,
+            cov_cols=cov_cols,
+        )
+        if aggr_data is not None:
+            return aggr_data
         data = data.lazy()
 
-    covar_cols = tuple({*var_cols, *itertools.chain(*cov_cols)})
+    covar_cols = tuple({*var_cols, *(col for pair in cov_cols for col in pair)})
     if len(covar_cols) > 0:
         data = (
             data.with_columns(**{
-                _DEMEAN.format(col): _demean_nw_col(col, group_col)
+                _demean_name(col): _demean_nw_col(col, group_col)
                 for col in covar_cols
             })
             .with_columns(
                 **{
-                    _VAR.format(col):
-                        nw.col(_DEMEAN.format(col)) * nw.col(_DEMEAN.format(col))
+                    _var_name(col):
+                        nw.col(_demean_name(col)) * nw.col(_demean_name(col))
                     for col in var_cols
                 },
                 **{
-                    _COV.format(left, right):
-                        nw.col(_DEMEAN.format(left)) * nw.col(_DEMEAN.format(right))
+                    _cov_name(left, right):
+                        nw.col(_demean_name(left)) * nw.col(_demean_name(right))
                     for left, right in cov_cols
                 },
             )
         )
 
     count_expr = {_COUNT: nw.len()} if has_count or len(covar_cols) > 0 else {}
-    mean_expr = {_MEAN.format(col): nw.col(col).mean() for col in mean_cols}
-    var_expr = {_VAR.format(col): nw.col(_VAR.format(col)).mean() for col in var_cols}
+    mean_expr = {_mean_name(col): nw.col(col).mean() for col in mean_cols}
+    var_expr = {_var_name(col): nw.col(_var_name(col)).mean() for col in var_cols}
     cov_expr = {
-        _COV.format(left, right): nw.col(_COV.format(left, right)).mean()
+        _cov_name(left, right): nw.col(_cov_name(left, right)).mean()
         for left, right in cov_cols
     }
     all_expr = count_expr | mean_expr | var_expr | cov_expr
@@ -443,11 +632,11 @@ def _read_aggr_narwhals(
     if len(covar_cols) > 0:
         aggr_data = aggr_data.with_columns(
             **{
-                _VAR.format(col): nw.col(_VAR.format(col)) / (1 - 1/nw.col(_COUNT))
+                _var_name(col): nw.col(_var_name(col)) / (1 - 1/nw.col(_COUNT))
                 for col in var_cols
             },
             **{
-                _COV.format(left, right): nw.col(_COV.format(left, right)) /
+                _cov_name(left, right): nw.col(_cov_name(left, right)) /
                     (1 - 1/nw.col(_COUNT))
                 for left, right in cov_cols
             },
@@ -456,6 +645,83 @@ def _read_aggr_narwhals(
     return aggr_data.collect().to_arrow().to_pylist()
 
 
+def _read_aggr_numpy(
+    data: nw.DataFrame[Any],
+    group_col: str | None,
+    *,
+    has_count: bool,
+    mean_cols: Sequence[str],
+    var_cols: Sequence[str],
+    cov_cols: Sequence[tuple[str, str]],
+) -> list[dict[str, int | float]] | None:
+    covar_cols = tuple({*var_cols, *(col for pair in cov_cols for col in pair)})
+    cols = tuple({*mean_cols, *covar_cols})
+    check_cols = cols if group_col is None else (*cols, group_col)
+    # Leave nulls, empty and large data to the lazy path. The lazy engines are
+    # faster on large data, and keeping the nulls there keeps their semantics.
+    if (
+        not 0 < len(data) <= _NUMPY_MAX_ROWS
+        or any(data[col].null_count() > 0 for col in check_cols)
+    ):
+        return None
+
+    if group_col is None:
+        groups: list[Any] = [None]
+        codes = np.zeros(len(data), dtype=np.intp)
+    else:
+        _, first, codes = np.unique(
+            data[group_col].to_numpy(),
+            return_index=True,
+            return_inverse=True,
+        )
+        groups = data[group_col][first].to_list()
+
+    # Sums by group with bincount don't require sorting or copying the data.
+    counts = np.bincount(codes, minlength=len(groups))
+    values = {
+        col: data[col].to_numpy().astype(np.float64, copy=False)
+        for col in cols
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = {
+            col: np.bincount(codes, weights=values[col], minlength=len(groups)) / counts
+            for col in cols
+        }
+        demeaned = {col: values[col] - means[col][codes] for col in covar_cols}
+        vars_ = {
+            col: np.bincount(
+                codes,
+                weights=demeaned[col] * demeaned[col],
+                minlength=len(groups),
+            ) / (counts - 1)
+            for col in var_cols
+        }
+        covs = {
+            (left, right): np.bincount(
+                codes,
+                weights=demeaned[left] * demeaned[right],
+                minlength=len(groups),
+            ) / (counts - 1)
+            for left, right in cov_cols
+        }
+
+    count_list = counts.tolist()
+    mean_lists = {col: mean.tolist() for col, mean in means.items()}
+    var_lists = {col: var.tolist() for col, var in vars_.items()}
+    cov_lists = {cols: cov.tolist() for cols, cov in covs.items()}
+    return [
+        ({group_col: group} if group_col is not None else {})
+        | ({_COUNT: count_list[i]} if has_count else {})
+        | {_mean_name(col): mean_lists[col][i] for col in mean_cols}
+        | {_var_name(col): var_lists[col][i] for col in var_cols}
+        | {
+            _cov_name(left, right): cov_lists[left, right][i]
+            for left, right in cov_cols
+        }
+        for i, group in enumerate(groups)
+    ]
+
+
 def _demean_nw_col(col: str, group_col: str | None) -> nw.Expr:
     if group_col is None:
         return nw.col(col) - nw.col(col).mean()
@@ -470,9 +736,9 @@ def _get_aggregates(
     var_cols: Sequence[str],
     cov_cols: Sequence[tuple[str, str]],
 ) -> Aggregates:
-    return Aggregates(
+    return Aggregates._unsafe_new(
         count_=data[_COUNT] if has_count else None,  # type: ignore
-        mean_={col: data[_MEAN.format(col)] for col in mean_cols},
-        var_={col: data[_VAR.format(col)] for col in var_cols},
-        cov_={cols: data[_COV.format(*cols)] for cols in cov_cols},
+        mean_={col: data[_mean_name(col)] for col in mean_cols},
+        var_={col: data[_var_name(col)] for col in var_cols},
+        cov_={cols: data[_cov_name(*cols)] for cols in cov_cols},
     )
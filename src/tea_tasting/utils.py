@@ -665,6 +665,8 @@ class ReprMixin:
 
     Representation string is generated based on parameters values saved in attributes.
     """
+    __slots__ = ()
+
     @classmethod
     def _get_param_names(cls) -> Iterator[str]:
         if cls.__init__ is object.__init__:
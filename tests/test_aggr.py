@@ -12,6 +12,7 @@ import pytest
 
 import tea_tasting.aggr
 import tea_tasting.datasets
+import tea_tasting.utils
 
 
 if TYPE_CHECKING:
@@ -61,10 +62,15 @@ def data_duckdb(data_arrow: pa.Table) -> ibis.expr.types.Table:
 def data_sqlite(data_arrow: pa.Table) -> ibis.expr.types.Table:
     return ibis.connect("sqlite://").create_table("data", data_arrow)
 
+@pytest.fixture
+def data_memtable(data_pandas: pd.DataFrame) -> ibis.expr.types.Table:
+    return ibis.memtable(data_pandas)
+
 @pytest.fixture(params=[
     "data_arrow", "data_pandas",
     "data_polars", "data_polars_lazy",
     "data_duckdb", "data_sqlite",
+    "data_memtable",
 ])
 def data(request: pytest.FixtureRequest) -> Frame:
     return request.getfixturevalue(request.param)
@@ -123,6 +129,15 @@ def test_aggregates_init(aggr: tea_tasting.aggr.Aggregates) -> None:
     assert aggr.mean_ == MEAN
     assert aggr.var_ == VAR
     assert aggr.cov_ == COV
+    assert not hasattr(aggr, "__dict__")
+
+def test_aggregates_with_zero_div(aggr: tea_tasting.aggr.Aggregates) -> None:
+    aggr_zero_div = aggr.with_zero_div()
+    assert isinstance(aggr_zero_div.count_, tea_tasting.utils.Int)
+    assert isinstance(aggr_zero_div.mean_["x"], tea_tasting.utils.Float)
+    assert aggr_zero_div.mean_ == MEAN
+    assert aggr_zero_div.var_ == VAR
+    assert aggr_zero_div.cov_ == COV
 
 def test_aggregates_calls(aggr: tea_tasting.aggr.Aggregates) -> None:
     assert aggr.count() == COUNT
@@ -131,6 +146,17 @@ def test_aggregates_calls(aggr: tea_tasting.aggr.Aggregates) -> None:
     assert aggr.var("x") == VAR["x"]
     assert aggr.mean("y") == MEAN["y"]
     assert aggr.cov("x", "y") == COV["x", "y"]
+    assert aggr.cov("y", "x") == COV["x", "y"]
+    assert aggr.cov("x", "x") == VAR["x"]
+
+def test_aggregates_cov_diagonal() -> None:
+    aggr = tea_tasting.aggr.Aggregates(
+        count_=10,
+        mean_={"x": 1.0},
+        var_={},
+        cov_={("x", "x"): 2.0},
+    )
+    assert aggr.cov("x", "x") == 2.0
 
 def test_aggregates_count_raises() -> None:
     aggr = tea_tasting.aggr.Aggregates(count_=None, mean_={}, var_={}, cov_={})
@@ -165,6 +191,85 @@ def test_aggregates_add(
     assert aggrs_add.var_ == pytest.approx(correct_aggr.var_)
     assert aggrs_add.cov_ == pytest.approx(correct_aggr.cov_)
 
+def test_aggregates_reduce(
+    correct_aggr: tea_tasting.aggr.Aggregates,
+    correct_aggrs: dict[int, tea_tasting.aggr.Aggregates],
+) -> None:
+    aggrs_reduce = tea_tasting.aggr.Aggregates.reduce(correct_aggrs.values())
+    assert aggrs_reduce.count_ == correct_aggr.count_
+    assert aggrs_reduce.mean_ == pytest.approx(correct_aggr.mean_)
+    assert aggrs_reduce.var_ == pytest.approx(correct_aggr.var_)
+    assert aggrs_reduce.cov_ == pytest.approx(correct_aggr.cov_)
+
+def test_aggregates_reduce_unaligned(aggr: tea_tasting.aggr.Aggregates) -> None:
+    aggr_reversed = tea_tasting.aggr.Aggregates(
+        count_=COUNT,
+        mean_=dict(reversed(MEAN.items())),
+        var_=dict(reversed(VAR.items())),
+        cov_={("y", "x"): COV["x", "y"]},
+    )
+    aggrs_reduce = tea_tasting.aggr.Aggregates.reduce([aggr, aggr_reversed])
+    aggrs_add = aggr + aggr_reversed
+    assert aggrs_reduce.count_ == aggrs_add.count_
+    assert aggrs_reduce.mean_ == pytest.approx(aggrs_add.mean_)
+    assert aggrs_reduce.var_ == pytest.approx(aggrs_add.var_)
+    assert aggrs_reduce.cov_ == pytest.approx(aggrs_add.cov_)
+
+def test_aggregates_reduce_one(aggr: tea_tasting.aggr.Aggregates) -> None:
+    assert tea_tasting.aggr.Aggregates.reduce([aggr]) is aggr
+
+def test_aggregates_reduce_empty() -> None:
+    aggrs_reduce = tea_tasting.aggr.Aggregates.reduce(
+        [tea_tasting.aggr.Aggregates(), tea_tasting.aggr.Aggregates()])
+    assert aggrs_reduce.count_ is None
+    assert aggrs_reduce.mean_ == {}
+
+def test_aggregates_reduce_zero_div() -> None:
+    aggr = tea_tasting.aggr.Aggregates(
+        count_=1,
+        mean_={"x": 1.0},
+        var_={"x": 0.0},
+        cov_={},
+    ).with_zero_div()
+    aggrs_reduce = tea_tasting.aggr.Aggregates.reduce([aggr, aggr])
+    aggrs_add = aggr + aggr
+    assert isinstance(aggrs_reduce.count_, tea_tasting.utils.Int)
+    assert isinstance(aggrs_reduce.mean_["x"], tea_tasting.utils.Float)
+    assert aggrs_reduce.mean_ == aggrs_add.mean_
+    assert aggrs_reduce.var_ == aggrs_add.var_
+    assert aggrs_reduce.ratio_var("x", "x") == aggrs_add.ratio_var("x", "x")
+
+def test_aggregates_reduce_zero_div_raises() -> None:
+    aggr = tea_tasting.aggr.Aggregates(count_=0, mean_={"x": 1.0}, var_={"x": 1.0})
+    with pytest.raises(ZeroDivisionError):
+        tea_tasting.aggr.Aggregates.reduce([aggr, aggr])
+    aggr_one = tea_tasting.aggr.Aggregates(count_=1, mean_={"x": 1.0}, var_={"x": 0.0})
+    with pytest.raises(ZeroDivisionError):
+        tea_tasting.aggr.Aggregates.reduce([aggr_one, aggr])
+    aggr_mean = tea_tasting.aggr.Aggregates(count_=1, mean_={"x": 1.0})
+    aggr_mean_zero = tea_tasting.aggr.Aggregates(count_=0, mean_={"x": 1.0})
+    aggrs_reduce = tea_tasting.aggr.Aggregates.reduce([aggr_mean, aggr_mean_zero])
+    assert aggrs_reduce.mean_ == (aggr_mean + aggr_mean_zero).mean_
+
+def test_aggregates_reduce_raises() -> None:
+    with pytest.raises(ValueError, match="At least one"):
+        tea_tasting.aggr.Aggregates.reduce([])
+    aggr = tea_tasting.aggr.Aggregates(count_=5, var_={"x": 1.0})
+    with pytest.raises(KeyError):
+        tea_tasting.aggr.Aggregates.reduce([aggr, aggr])
+    aggr_cov = tea_tasting.aggr.Aggregates(
+        count_=5, mean_={"x": 1.0}, var_={"x": 1.0})
+    with pytest.raises(KeyError):
+        tea_tasting.aggr.Aggregates.reduce([aggr_cov, tea_tasting.aggr.Aggregates(
+            count_=5, mean_={"x": 1.0})])
+
+def test_aggregates_add_empty() -> None:
+    aggrs_add = tea_tasting.aggr.Aggregates() + tea_tasting.aggr.Aggregates()
+    assert aggrs_add.count_ is None
+    assert aggrs_add.mean_ == {}
+    assert aggrs_add.var_ == {}
+    assert aggrs_add.cov_ == {}
+
 
 def test_read_aggregates_groups(
     data: Frame,
@@ -201,6 +306,68 @@ def test_read_aggregates_no_groups(
     assert aggr.var_ == pytest.approx(correct_aggr.var_)
     assert aggr.cov_ == pytest.approx(correct_aggr.cov_)
 
+def test_aggr_ibis_single_pass(data_duckdb: ibis.expr.types.Table) -> None:
+    sql = ibis.to_sql(tea_tasting.aggr._aggr_ibis(
+        data_duckdb,
+        group_col="variant",
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(("sessions", "orders"),),
+    ))
+    assert "_demean__" not in sql
+    assert " OVER " not in sql.upper()
+
+def test_aggr_ibis_single_pass_var(data_sqlite: ibis.expr.types.Table) -> None:
+    sql = ibis.to_sql(tea_tasting.aggr._aggr_ibis(
+        data_sqlite,
+        group_col="variant",
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(),
+    ))
+    assert "_demean__" not in sql
+    assert " OVER " not in sql.upper()
+
+def test_read_aggregates_no_var_cov_ops(
+    data_duckdb: ibis.expr.types.Table,
+    correct_aggrs: dict[int, tea_tasting.aggr.Aggregates],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def has_operation(_op: object) -> bool:
+        return False
+    monkeypatch.setattr(ibis.get_backend(data_duckdb), "has_operation", has_operation)
+    aggrs = tea_tasting.aggr.read_aggregates(
+        data_duckdb,
+        group_col="variant",
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(("sessions", "orders"),),
+    )
+    for i in (0, 1):
+        assert aggrs[i].count_ == pytest.approx(correct_aggrs[i].count_)
+        assert aggrs[i].mean_ == pytest.approx(correct_aggrs[i].mean_)
+        assert aggrs[i].var_ == pytest.approx(correct_aggrs[i].var_)
+        assert aggrs[i].cov_ == pytest.approx(correct_aggrs[i].cov_)
+
+def test_read_aggregates_cov_diagonal(
+    data_arrow: pa.Table,
+    correct_aggr: tea_tasting.aggr.Aggregates,
+) -> None:
+    aggr = tea_tasting.aggr.read_aggregates(
+        data_arrow,
+        group_col=None,
+        has_count=True,
+        mean_cols=("orders",),
+        var_cols=(),
+        cov_cols=(("orders", "orders"),),
+    )
+    assert aggr.var_ == pytest.approx({"orders": correct_aggr.var_["orders"]})
+    assert aggr.cov_ == {}
+    assert aggr.cov("orders", "orders") == pytest.approx(correct_aggr.var_["orders"])
+
 def test_read_aggregates_no_count(data_arrow: pa.Table) -> None:
     aggr = tea_tasting.aggr.read_aggregates(
         data_arrow,
@@ -213,3 +380,85 @@ def test_read_aggregates_no_count(data_arrow: pa.Table) -> None:
     assert aggr.count_ is None
     assert aggr.var_ == {}
     assert aggr.cov_ == {}
+
+def test_read_aggregates_large(
+    data_arrow: pa.Table,
+    correct_aggrs: dict[int, tea_tasting.aggr.Aggregates],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(tea_tasting.aggr, "_NUMPY_MAX_ROWS", 10)
+    for data in (data_arrow, ibis.memtable(data_arrow)):
+        aggrs = tea_tasting.aggr.read_aggregates(
+            data,
+            group_col="variant",
+            has_count=True,
+            mean_cols=("sessions", "orders"),
+            var_cols=("sessions", "orders"),
+            cov_cols=(("sessions", "orders"),),
+        )
+        for i in (0, 1):
+            assert aggrs[i].count_ == correct_aggrs[i].count_
+            assert aggrs[i].mean_ == pytest.approx(correct_aggrs[i].mean_)
+            assert aggrs[i].var_ == pytest.approx(correct_aggrs[i].var_)
+            assert aggrs[i].cov_ == pytest.approx(correct_aggrs[i].cov_)
+
+def test_read_aggregates_nulls(data_arrow: pa.Table) -> None:
+    orders = data_arrow["orders"].to_pylist()
+    orders[0] = None
+    data = data_arrow.set_column(
+        data_arrow.schema.get_field_index("orders"),
+        "orders",
+        pa.array(orders),
+    )
+    aggrs = tea_tasting.aggr.read_aggregates(
+        data,
+        group_col="variant",
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(("sessions", "orders"),),
+    )
+    correct_aggrs = tea_tasting.aggr.read_aggregates(
+        pl.from_arrow(data).lazy(),  # type: ignore
+        group_col="variant",
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(("sessions", "orders"),),
+    )
+    for i in (0, 1):
+        assert aggrs[i].count_ == correct_aggrs[i].count_
+        assert aggrs[i].mean_ == pytest.approx(correct_aggrs[i].mean_)
+        assert aggrs[i].var_ == pytest.approx(correct_aggrs[i].var_)
+        assert aggrs[i].cov_ == pytest.approx(correct_aggrs[i].cov_)
+
+def test_read_aggregates_memtable_nulls() -> None:
+    data = tea_tasting.datasets.make_users_data(n_users=200, rng=42)
+    orders = data["orders"].to_pylist()
+    for i in range(0, 200, 30):
+        orders[i] = None
+    data = data.set_column(
+        data.schema.get_field_index("orders"),
+        "orders",
+        pa.array(orders),
+    )
+    aggr = tea_tasting.aggr.read_aggregates(
+        ibis.memtable(data),
+        group_col=None,
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(("sessions", "orders"),),
+    )
+    correct_aggr = tea_tasting.aggr.read_aggregates(
+        ibis.connect("duckdb://").create_table("data", data),
+        group_col=None,
+        has_count=True,
+        mean_cols=("sessions", "orders"),
+        var_cols=("sessions", "orders"),
+        cov_cols=(("sessions", "orders"),),
+    )
+    assert aggr.count_ == correct_aggr.count_
+    assert aggr.mean_ == pytest.approx(correct_aggr.mean_)
+    assert aggr.var_ == pytest.approx(correct_aggr.var_)
+    assert aggr.cov_ == pytest.approx(correct_aggr.cov_)